@@ -0,0 +1,245 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Необов'язкове C-розширення для task_1.py: CSlidingWindow — той самий
+Sliding Window, що й SlidingWindowRateLimiter, але кільцеві буфери int64 (нс)
+і індекси head/count лежать у пам'яті C, а перевірка, запис і чистка
+неактивних користувачів — C-цикли.
+
+Збірка на місці (потрібен Cython і компілятор C):
+    cythonize -i _ratelimit.pyx
+Якщо модуль не зібраний, task_1.py працює на чистому Python.
+"""
+
+import sys
+import time
+
+from libc.stdint cimport int64_t
+from libc.stdlib cimport free, malloc, realloc
+
+# Позначка звільненого слоту в _last_seen: більша за будь-який cutoff, тож
+# _sweep не повертає такий слот у _free вдруге
+cdef int64_t _FREE_SLOT = 2**63 - 1
+
+
+cdef class CSlidingWindow:
+    """
+    Sliding Window Rate Limiter зі станом у C-масивах, індексованих слотом
+    користувача. API збігається з SlidingWindowRateLimiter (без пакетного
+    simulate_batch). Кожні _GC_INTERVAL викликів record_message/try_record
+    неактивні користувачі видаляються, а їхні слоти перевикористовуються.
+    """
+
+    cdef public object window_size
+    cdef public int64_t window_size_ns
+    cdef public Py_ssize_t max_requests
+    cdef object _now
+    cdef dict _slot
+    cdef list _user_of
+    cdef list _free
+    cdef public Py_ssize_t _GC_INTERVAL
+    cdef Py_ssize_t _ops_since_gc
+    # _buf[slot * max_requests + i] — кільцевий буфер таймштампів слоту,
+    # _head[slot] — індекс найстарішого, _count[slot] — кількість живих
+    cdef int64_t *_buf
+    cdef Py_ssize_t *_head
+    cdef Py_ssize_t *_count
+    # _last_seen[slot] — найновіший прийнятий таймштамп слоту
+    cdef int64_t *_last_seen
+    cdef Py_ssize_t _size
+    cdef Py_ssize_t _capacity
+
+    def __cinit__(
+        self, window_size=10, Py_ssize_t max_requests=1, clock=time.monotonic_ns
+    ):
+        if max_requests < 1:
+            raise ValueError("max_requests має бути >= 1")
+        self.window_size = window_size
+        self.window_size_ns = int(window_size * 1e9)
+        self.max_requests = max_requests
+        self._now = clock
+        self._slot = {}
+        # _user_of[slot] — user_id слоту; _free — слоти, звільнені _sweep
+        self._user_of = []
+        self._free = []
+        self._GC_INTERVAL = 4096
+        self._ops_since_gc = 0
+        self._size = 0
+        self._capacity = 16
+        self._buf = <int64_t *> malloc(
+            self._capacity * max_requests * sizeof(int64_t)
+        )
+        self._head = <Py_ssize_t *> malloc(self._capacity * sizeof(Py_ssize_t))
+        self._count = <Py_ssize_t *> malloc(self._capacity * sizeof(Py_ssize_t))
+        self._last_seen = <int64_t *> malloc(self._capacity * sizeof(int64_t))
+        if (
+            self._buf == NULL
+            or self._head == NULL
+            or self._count == NULL
+            or self._last_seen == NULL
+        ):
+            raise MemoryError()
+
+    def __dealloc__(self):
+        free(self._buf)
+        free(self._head)
+        free(self._count)
+        free(self._last_seen)
+
+    cdef int _grow(self) except -1:
+        """Подвоює ємність C-масивів стану."""
+        cdef Py_ssize_t capacity = 2 * self._capacity
+        cdef int64_t *buf = <int64_t *> realloc(
+            self._buf, capacity * self.max_requests * sizeof(int64_t)
+        )
+        if buf == NULL:
+            raise MemoryError()
+        self._buf = buf
+        cdef Py_ssize_t *head = <Py_ssize_t *> realloc(
+            self._head, capacity * sizeof(Py_ssize_t)
+        )
+        if head == NULL:
+            raise MemoryError()
+        self._head = head
+        cdef Py_ssize_t *count = <Py_ssize_t *> realloc(
+            self._count, capacity * sizeof(Py_ssize_t)
+        )
+        if count == NULL:
+            raise MemoryError()
+        self._count = count
+        cdef int64_t *last_seen = <int64_t *> realloc(
+            self._last_seen, capacity * sizeof(int64_t)
+        )
+        if last_seen == NULL:
+            raise MemoryError()
+        self._last_seen = last_seen
+        self._capacity = capacity
+        return 0
+
+    cdef inline void _cleanup(self, Py_ssize_t slot, int64_t now) noexcept:
+        """Зсуває head слоту за таймштампи, що вийшли за межі вікна."""
+        cdef Py_ssize_t max_requests = self.max_requests
+        cdef int64_t *ring = self._buf + slot * max_requests
+        cdef Py_ssize_t head = self._head[slot]
+        cdef Py_ssize_t count = self._count[slot]
+        cdef int64_t cutoff = now - self.window_size_ns
+        while count > 0 and ring[head] < cutoff:
+            head = (head + 1) % max_requests
+            count -= 1
+        self._head[slot] = head
+        self._count[slot] = count
+
+    def _slot_of(self, str user_id):
+        """Повертає слот user_id, виділяючи новий при першій появі."""
+        slot = self._slot.get(user_id)
+        if slot is None:
+            user_id = sys.intern(user_id)
+            if self._free:
+                slot = self._free.pop()
+                self._user_of[slot] = user_id
+            else:
+                if self._size == self._capacity:
+                    self._grow()
+                slot = self._size
+                self._size += 1
+                self._user_of.append(user_id)
+            self._head[<Py_ssize_t> slot] = 0
+            self._count[<Py_ssize_t> slot] = 0
+            self._last_seen[<Py_ssize_t> slot] = 0
+            self._slot[user_id] = slot
+        return slot
+
+    def _sweep(self, int64_t current_time):
+        """
+        Видаляє користувачів, чий найновіший таймштамп вийшов за межі
+        window_size, і повертає їхні слоти у _free.
+        """
+        self._ops_since_gc = 0
+        cdef int64_t cutoff = current_time - self.window_size_ns
+        cdef int64_t *last_seen = self._last_seen
+        cdef Py_ssize_t slot
+        for slot in range(self._size):
+            if last_seen[slot] < cutoff:
+                del self._slot[self._user_of[slot]]
+                self._user_of[slot] = None
+                self._head[slot] = 0
+                self._count[slot] = 0
+                last_seen[slot] = _FREE_SLOT
+                self._free.append(slot)
+
+    def _try_record_slot(self, Py_ssize_t slot, int64_t current_time):
+        """try_record для вже відомого слоту."""
+        if slot < 0 or slot >= self._size:
+            raise IndexError(slot)
+        self._cleanup(slot, current_time)
+        cdef Py_ssize_t max_requests = self.max_requests
+        cdef int64_t *ring = self._buf + slot * max_requests
+        cdef Py_ssize_t head = self._head[slot]
+        cdef Py_ssize_t count = self._count[slot]
+        if count < max_requests:
+            ring[(head + count) % max_requests] = current_time
+            self._count[slot] = count + 1
+            self._last_seen[slot] = current_time
+            return True, 0.0
+        cdef int64_t wait_ns = ring[head] + self.window_size_ns - current_time
+        return False, (wait_ns if wait_ns > 0 else 0) / 1e9
+
+    def can_send_message(self, str user_id, current_time=None):
+        """
+        Чи може user_id відправити повідомлення зараз?
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        slot = self._slot.get(user_id)
+        if slot is None:
+            return True
+        if current_time is None:
+            current_time = self._now()
+        self._cleanup(slot, current_time)
+        return self._count[<Py_ssize_t> slot] < self.max_requests
+
+    def record_message(self, str user_id, current_time=None):
+        """
+        Реєструє повідомлення. Повертає True, якщо вдалося (не перевищено ліміт),
+        інакше False.
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        if current_time is None:
+            current_time = self._now()
+        self._ops_since_gc += 1
+        if self._ops_since_gc >= self._GC_INTERVAL:
+            self._sweep(current_time)
+        return self._try_record_slot(self._slot_of(user_id), current_time)[0]
+
+    def try_record(self, str user_id, current_time=None):
+        """
+        Повертає (True, 0.0), якщо повідомлення зареєстровано,
+        інакше (False, скільки секунд чекати).
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        if current_time is None:
+            current_time = self._now()
+        self._ops_since_gc += 1
+        if self._ops_since_gc >= self._GC_INTERVAL:
+            self._sweep(current_time)
+        return self._try_record_slot(self._slot_of(user_id), current_time)
+
+    def time_until_next_allowed(self, str user_id, current_time=None):
+        """
+        Скільки секунд треба зачекати, щоб було дозволено відправити?
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        slot = self._slot.get(user_id)
+        if slot is None:
+            return 0.0
+        if current_time is None:
+            current_time = self._now()
+        cdef Py_ssize_t s = slot
+        cdef int64_t now = current_time
+        self._cleanup(s, now)
+        if self._count[s] < self.max_requests:
+            return 0.0
+        cdef int64_t wait_ns = (
+            self._buf[s * self.max_requests + self._head[s]]
+            + self.window_size_ns
+            - now
+        )
+        return (wait_ns if wait_ns > 0 else 0) / 1e9
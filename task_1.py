@@ -1,129 +1,617 @@
+import array
 import logging
 import random
-from typing import Dict, Deque
+from typing import Callable, Dict, List, Optional, Tuple
 import time
 import sys
 import timeit
-from colorama import init, Fore
-from collections import deque
+from types import SimpleNamespace
+
+try:
+    import numpy as np
+except ImportError:  # numpy потрібен лише для пакетного режиму simulate_batch
+    np = None
+
+try:
+    from numba import njit
+except ImportError:  # без numba ядра виконуються як звичайний Python
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+try:
+    from _ratelimit import CSlidingWindow
+except ImportError:  # розширення не зібране (cythonize -i _ratelimit.pyx)
+    CSlidingWindow = None
+
+
+# Кольори потрібні лише в терміналі: при перенаправленні stdout (timeit, CI)
+# colorama не імпортуємо, а коди кольорів — порожні рядки.
+USE_COLOR = sys.stdout.isatty()
+if USE_COLOR:
+    from colorama import init, Fore
+
+    init(autoreset=True)
+else:
+    Fore = SimpleNamespace(CYAN="", GREEN="", YELLOW="")
 
-init(autoreset=True)
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - [%(levelname)s] - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Шаблони рядків виводу demo_scenario: колір і статус уже вшиті, тож кожен
+# рядок форматується за один прохід.
+_OK_LINE = Fore.GREEN + "Повідомлення {:2d} | Користувач {} | ✓\n"
+_WAIT_LINE = Fore.YELLOW + "Повідомлення {:2d} | Користувач {} | {}\n"
+# Готові рядки очікування для 0.0..10.0с з кроком 0.1с (ключ — десяті секунди)
+_WAIT_STATUS = {i: f"× (очікування {i / 10:.1f}с)" for i in range(101)}
+
+
+def _wait_status(wait_time: float) -> str:
+    """
+    Рядок статусу відхиленого повідомлення: з таблиці або форматований.
+    Ключ — round(wait_time * 10), тож на точних межах (0.15, 0.35, ...)
+    значення може відрізнятися від %.1f на 0.1с — для виводу це прийнятно.
+    """
+    status = _WAIT_STATUS.get(round(wait_time * 10))
+    if status is None:
+        status = f"× (очікування {wait_time:.1f}с)"
+    return status
+
+
+# Позначка вільного слоту в масивах last_seen/deadline: максимальний int64,
+# тож чистка ніколи не вважає такий слот застарілим
+_FREE_SLOT = 2**63 - 1
+
+
+class FakeClock:
+    """
+    Штучний годинник для бенчмарків: виклик повертає поточний час (нс),
+    а sleep() лише зсуває його, не зупиняючи виконання.
+    """
+
+    def __init__(self, start: int = 0):
+        self.now = start
+
+    def __call__(self) -> int:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += int(seconds * 1e9)
+
 
 class SlidingWindowRateLimiter:
     """
     Реалізація Rate Limiter із алгоритмом Sliding Window.
-    Для кожного user_id зберігаємо deque з таймштампами (time.time()).
+    Для кожного user_id зберігаємо кільцевий буфер таймштампів (time.monotonic_ns()).
     Користувач може надіслати max_requests за window_size сек.
+    Внутрішньо час зберігається цілими наносекундами.
+    Рядкові user_id при першій появі отримують цілий слот; стан усіх
+    користувачів лежить у плоских масивах (SoA), індексованих слотом,
+    без окремого об'єкта на кожного користувача.
+    Кожні _GC_INTERVAL викликів record_message/try_record неактивні користувачі
+    видаляються, а їхні слоти перевикористовуються.
     """
 
-    def __init__(self, window_size: int = 10, max_requests: int = 1):
+    _GC_INTERVAL = 4096
+
+    def __init__(
+        self,
+        window_size: int = 10,
+        max_requests: int = 1,
+        clock: Callable[[], int] = time.monotonic_ns,
+    ):
+        if max_requests < 1:
+            raise ValueError("max_requests має бути >= 1")
         self.window_size = window_size
+        self.window_size_ns = int(window_size * 1e9)
         self.max_requests = max_requests
-        # user_messages[user_id] = deque([...timestamps...])
-        self.user_messages: Dict[str, Deque[float]] = {}
+        # Монотонний годинник не стрибає при корекції системного часу (NTP);
+        # для бенчмарків і тестів можна передати FakeClock
+        self._now = clock
+        # _slot[user_id] = слот (ключі інтерновані через sys.intern)
+        self._slot: Dict[str, int] = {}
+        # _buf[slot * max_requests : (slot + 1) * max_requests] — кільцевий буфер
+        # таймштампів слоту; _head[slot] — індекс найстарішого таймштампу,
+        # _count[slot] — кількість живих таймштампів у вікні
+        self._buf = array.array("q")
+        self._head = array.array("l")
+        self._count = array.array("l")
+        self._empty_ring = array.array("q", [0] * max_requests)
+        # _last_seen[slot] — найновіший прийнятий таймштамп слоту, _user_of[slot] —
+        # його user_id: _sweep обходить лише цей плоский масив
+        self._last_seen = array.array("q")
+        self._user_of: List[Optional[str]] = []
+        # Слоти, звільнені _sweep, і лічильник операцій до наступної чистки
+        self._free: List[int] = []
+        self._ops_since_gc = 0
+
+    def _slot_of(self, user_id: str) -> int:
+        """Повертає слот user_id, виділяючи новий при першій появі."""
+        slot = self._slot.get(user_id)
+        if slot is None:
+            user_id = sys.intern(user_id)
+            if self._free:
+                slot = self._free.pop()
+                self._last_seen[slot] = 0
+                self._user_of[slot] = user_id
+            else:
+                slot = len(self._head)
+                self._buf.extend(self._empty_ring)
+                self._head.append(0)
+                self._count.append(0)
+                self._last_seen.append(0)
+                self._user_of.append(user_id)
+            self._slot[user_id] = slot
+        return slot
 
-    def _cleanup_window(self, user_id: str, current_time: float) -> None:
-        """Видаляє з deque усі таймштампи, що вийшли за межі window_size."""
-        if user_id not in self.user_messages:
+    def _sweep(self, current_time: int) -> None:
+        """
+        Видаляє користувачів, чий найновіший таймштамп вийшов за межі
+        window_size, і повертає їхні слоти у _free.
+        """
+        self._ops_since_gc = 0
+        cutoff = current_time - self.window_size_ns
+        last_seen = self._last_seen
+        # Один прохід min() на рівні C: якщо застарілих немає — виходимо одразу
+        if not last_seen or min(last_seen) >= cutoff:
             return
-        timestamps = self.user_messages[user_id]
-        cutoff = current_time - self.window_size
-        while timestamps and timestamps[0] < cutoff:
-            timestamps.popleft()
-        # Якщо порожній — видаляємо
-        if not timestamps:
-            del self.user_messages[user_id]
-
-    def can_send_message(self, user_id: str) -> bool:
-        """Чи може user_id відправити повідомлення зараз?"""
-        current_time = time.time()
-        self._cleanup_window(user_id, current_time)
-        if user_id not in self.user_messages:
+        stale = [slot for slot, t in enumerate(last_seen) if t < cutoff]
+        for slot in stale:
+            del self._slot[self._user_of[slot]]
+            self._user_of[slot] = None
+            self._head[slot] = 0
+            self._count[slot] = 0
+            last_seen[slot] = _FREE_SLOT
+            self._free.append(slot)
+
+    def _try_record_slot(self, slot: int, current_time: int) -> Tuple[bool, float]:
+        """
+        try_record для вже відомого слоту. Очищення вікна вписане прямо в
+        методи (без окремого виклику): head зсувається за таймштампи, що вийшли
+        за межі window_size, а сам буфер лишається для наступних повідомлень.
+        """
+        max_requests = self.max_requests
+        buf = self._buf
+        base = slot * max_requests
+        head = self._head[slot]
+        count = self._count[slot]
+        cutoff = current_time - self.window_size_ns
+        while count > 0 and buf[base + head] < cutoff:
+            head = (head + 1) % max_requests
+            count -= 1
+        self._head[slot] = head
+        if count < max_requests:
+            buf[base + (head + count) % max_requests] = current_time
+            self._count[slot] = count + 1
+            self._last_seen[slot] = current_time
+            return True, 0.0
+        self._count[slot] = count
+        wait_ns = buf[base + head] + self.window_size_ns - current_time
+        return False, max(wait_ns, 0) / 1e9
+
+    def simulate_batch(
+        self, user_ids: "np.ndarray", timestamps: "np.ndarray"
+    ) -> "np.ndarray":
+        """
+        Пакетна симуляція потоку подій на «чистому» лімітері (власний
+        стан не змінюється). Повертає np.ndarray[bool] — маску прийнятих подій
+        у порядку вхідних масивів. timestamps — у наносекундах, як current_time.
+        Потребує numpy; з numba сканування компілюється.
+        """
+        if np is None:
+            raise ImportError("simulate_batch потребує numpy")
+        user_ids = np.asarray(user_ids)
+        timestamps = np.asarray(timestamps)
+        # Дробові секунди мовчки обрізалися б до 0 нс — вимагаємо цілі наносекунди
+        if not np.issubdtype(timestamps.dtype, np.integer):
+            raise TypeError(
+                "timestamps мають бути цілими наносекундами, а не "
+                f"{timestamps.dtype}"
+            )
+        timestamps = timestamps.astype(np.int64, copy=False)
+        # Цілі коди користувачів і сортування за (користувач, час)
+        _, codes = np.unique(user_ids, return_inverse=True)
+        order = np.lexsort((timestamps, codes))
+        accepted = _sliding_window_scan(
+            codes[order], timestamps[order], self.window_size_ns, self.max_requests
+        )
+        mask = np.empty(len(order), dtype=np.bool_)
+        mask[order] = accepted
+        return mask
+
+    def can_send_message(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> bool:
+        """
+        Чи може user_id відправити повідомлення зараз?
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        if current_time is None:
+            current_time = self._now()
+        slot = self._slot.get(user_id)
+        if slot is None:
             return True
-        return len(self.user_messages[user_id]) < self.max_requests
+        max_requests = self.max_requests
+        buf = self._buf
+        base = slot * max_requests
+        head = self._head[slot]
+        count = self._count[slot]
+        cutoff = current_time - self.window_size_ns
+        while count > 0 and buf[base + head] < cutoff:
+            head = (head + 1) % max_requests
+            count -= 1
+        self._head[slot] = head
+        self._count[slot] = count
+        return count < max_requests
 
-    def record_message(self, user_id: str) -> bool:
+    def record_message(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> bool:
         """
         Реєструє повідомлення. Повертає True, якщо вдалося (не перевищено ліміт),
         інакше False.
+        current_time — час у наносекундах (None — прочитати годинник).
         """
-        current_time = time.time()
-        self._cleanup_window(user_id, current_time)
+        if current_time is None:
+            current_time = self._now()
+        self._ops_since_gc += 1
+        if self._ops_since_gc >= self._GC_INTERVAL:
+            self._sweep(current_time)
+        return self._try_record_slot(self._slot_of(user_id), current_time)[0]
 
-        if user_id not in self.user_messages:
-            self.user_messages[user_id] = deque()
+    def try_record(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> Tuple[bool, float]:
+        """
+        Об'єднує record_message і time_until_next_allowed в один прохід:
+        повертає (True, 0.0), якщо повідомлення зареєстровано,
+        інакше (False, скільки секунд чекати).
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        if current_time is None:
+            current_time = self._now()
+        self._ops_since_gc += 1
+        if self._ops_since_gc >= self._GC_INTERVAL:
+            self._sweep(current_time)
+        return self._try_record_slot(self._slot_of(user_id), current_time)
 
-        timestamps = self.user_messages[user_id]
-        if len(timestamps) < self.max_requests:
-            timestamps.append(current_time)
-            return True
-        else:
-            return False
-
-    def time_until_next_allowed(self, user_id: str) -> float:
-        """Скільки секунд треба зачекати, щоб було дозволено відправити?"""
-        current_time = time.time()
-        self._cleanup_window(user_id, current_time)
-        if user_id not in self.user_messages:
+    def time_until_next_allowed(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> float:
+        """
+        Скільки секунд треба зачекати, щоб було дозволено відправити?
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        if current_time is None:
+            current_time = self._now()
+        slot = self._slot.get(user_id)
+        if slot is None:
+            return 0.0
+        max_requests = self.max_requests
+        buf = self._buf
+        base = slot * max_requests
+        head = self._head[slot]
+        count = self._count[slot]
+        cutoff = current_time - self.window_size_ns
+        while count > 0 and buf[base + head] < cutoff:
+            head = (head + 1) % max_requests
+            count -= 1
+        self._head[slot] = head
+        self._count[slot] = count
+        if count < max_requests:
             return 0.0
-        timestamps = self.user_messages[user_id]
-        if len(timestamps) < self.max_requests:
+        earliest = buf[base + head]
+        allow_time = earliest + self.window_size_ns
+        wait_ns = allow_time - current_time
+        return max(wait_ns, 0) / 1e9
+
+
+@njit(cache=True)
+def _sliding_window_scan(codes, times, window_size, max_requests):
+    """
+    Жадібне сканування подій, відсортованих за (користувач, час),
+    з тим самим кільцевим буфером, що й у SlidingWindowRateLimiter.
+    """
+    n = len(times)
+    accepted = np.zeros(n, dtype=np.bool_)
+    buf = np.zeros(max_requests, dtype=np.int64)
+    head = 0
+    count = 0
+    for i in range(n):
+        if i == 0 or codes[i] != codes[i - 1]:
+            head = 0
+            count = 0
+        cutoff = times[i] - window_size
+        while count > 0 and buf[head] < cutoff:
+            head = (head + 1) % max_requests
+            count -= 1
+        if count < max_requests:
+            buf[(head + count) % max_requests] = times[i]
+            count += 1
+            accepted[i] = True
+    return accepted
+
+
+@njit(cache=True)
+def _scan(uid, now, window, max_req, buf, head, count):
+    """
+    Очищення вікна й додавання таймштампу для рядка uid стану
+    NumbaSlidingWindowRateLimiter. Повертає (accepted, wait_ns).
+    """
+    h = head[uid]
+    c = count[uid]
+    cutoff = now - window
+    while c > 0 and buf[uid, h] < cutoff:
+        h = (h + 1) % max_req
+        c -= 1
+    head[uid] = h
+    if c < max_req:
+        buf[uid, (h + c) % max_req] = now
+        count[uid] = c + 1
+        return True, 0
+    count[uid] = c
+    return False, max(buf[uid, h] + window - now, 0)
+
+
+@njit(cache=True)
+def _peek(uid, now, window, max_req, buf, head, count):
+    """Як _scan, але без додавання: повертає (allowed, wait_ns)."""
+    h = head[uid]
+    c = count[uid]
+    cutoff = now - window
+    while c > 0 and buf[uid, h] < cutoff:
+        h = (h + 1) % max_req
+        c -= 1
+    head[uid] = h
+    count[uid] = c
+    if c < max_req:
+        return True, 0
+    return False, max(buf[uid, h] + window - now, 0)
+
+
+class NumbaSlidingWindowRateLimiter:
+    """
+    Той самий Sliding Window, але стан усіх користувачів лежить у масивах NumPy:
+    buf[slot, i] — кільцевий буфер таймштампів, head[slot] і count[slot] — його
+    індекси. Перевірка й запис виконуються скомпільованим @njit-ядром _scan.
+    Потребує numpy (і numba для швидкодії).
+    """
+
+    def __init__(
+        self,
+        window_size: int = 10,
+        max_requests: int = 1,
+        capacity: int = 1024,
+        clock: Callable[[], int] = time.monotonic_ns,
+    ):
+        if np is None:
+            raise ImportError("NumbaSlidingWindowRateLimiter потребує numpy")
+        if max_requests < 1:
+            raise ValueError("max_requests має бути >= 1")
+        if capacity < 1:
+            raise ValueError("capacity має бути >= 1")
+        self.window_size = window_size
+        self.window_size_ns = int(window_size * 1e9)
+        self.max_requests = max_requests
+        self._now = clock
+        self._slot: Dict[str, int] = {}
+        self.buf = np.zeros((capacity, max_requests), dtype=np.int64)
+        self.head = np.zeros(capacity, dtype=np.int32)
+        self.count = np.zeros(capacity, dtype=np.int32)
+
+    def _grow(self) -> None:
+        """Подвоює кількість рядків стану."""
+        size = len(self.head)
+        buf = np.zeros((2 * size, self.max_requests), dtype=np.int64)
+        head = np.zeros(2 * size, dtype=np.int32)
+        count = np.zeros(2 * size, dtype=np.int32)
+        buf[:size] = self.buf
+        head[:size] = self.head
+        count[:size] = self.count
+        self.buf, self.head, self.count = buf, head, count
+
+    def _slot_of(self, user_id: str) -> int:
+        """Повертає слот user_id, виділяючи новий при першій появі."""
+        slot = self._slot.get(user_id)
+        if slot is None:
+            slot = self._slot.setdefault(sys.intern(user_id), len(self._slot))
+            if slot == len(self.head):
+                self._grow()
+        return slot
+
+    def _check_slot(self, slot: int) -> None:
+        """Ядра @njit не перевіряють межі — слот має бути вже виділеним."""
+        if not 0 <= slot < len(self._slot):
+            raise IndexError(slot)
+
+    def _try_record_slot(self, slot: int, current_time: int) -> Tuple[bool, float]:
+        """try_record для вже відомого слоту."""
+        self._check_slot(slot)
+        accepted, wait_ns = _scan(
+            slot,
+            current_time,
+            self.window_size_ns,
+            self.max_requests,
+            self.buf,
+            self.head,
+            self.count,
+        )
+        return accepted, wait_ns / 1e9
+
+    def _peek_slot(self, slot: int, current_time: int) -> Tuple[bool, float]:
+        """Перевірка без запису для вже відомого слоту."""
+        self._check_slot(slot)
+        allowed, wait_ns = _peek(
+            slot,
+            current_time,
+            self.window_size_ns,
+            self.max_requests,
+            self.buf,
+            self.head,
+            self.count,
+        )
+        return allowed, wait_ns / 1e9
+
+    def can_send_message(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> bool:
+        """
+        Чи може user_id відправити повідомлення зараз?
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        slot = self._slot.get(user_id)
+        if slot is None:
+            return True
+        if current_time is None:
+            current_time = self._now()
+        return self._peek_slot(slot, current_time)[0]
+
+    def record_message(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> bool:
+        """
+        Реєструє повідомлення. Повертає True, якщо вдалося.
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        if current_time is None:
+            current_time = self._now()
+        return self._try_record_slot(self._slot_of(user_id), current_time)[0]
+
+    def try_record(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> Tuple[bool, float]:
+        """
+        Повертає (True, 0.0) при реєстрації, інакше (False, секунди очікування).
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        if current_time is None:
+            current_time = self._now()
+        return self._try_record_slot(self._slot_of(user_id), current_time)
+
+    def time_until_next_allowed(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> float:
+        """
+        Скільки секунд треба зачекати, щоб було дозволено відправити?
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        slot = self._slot.get(user_id)
+        if slot is None:
             return 0.0
-        earliest = timestamps[0]
-        allow_time = earliest + self.window_size
-        wait = allow_time - current_time
-        return max(wait, 0.0)
+        if current_time is None:
+            current_time = self._now()
+        return self._peek_slot(slot, current_time)[1]
+
+
+def create_sliding_window_limiter(
+    window_size: int = 10,
+    max_requests: int = 1,
+    clock: Callable[[], int] = time.monotonic_ns,
+    use_extension: bool = True,
+):
+    """
+    Повертає CSlidingWindow з тим самим API, якщо розширення _ratelimit
+    зібране, інакше (або при use_extension=False) — SlidingWindowRateLimiter.
+    """
+    if use_extension and CSlidingWindow is not None:
+        return CSlidingWindow(window_size, max_requests, clock)
+    return SlidingWindowRateLimiter(window_size, max_requests, clock)
 
 
-def demo_scenario():
+def demo_scenario(
+    quiet: bool = False,
+    clock: Optional[Callable[[], int]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+):
     """
     Демонстраційна функція, що відтворює логіку:
       - 10 повідомлень від користувачів 1..5,
       - очікування 4 сек,
       - ще 10 повідомлень.
-    Використовує SlidingWindowRateLimiter(window_size=10, max_requests=1).
+    Використовує create_sliding_window_limiter(window_size=10, max_requests=1).
+    quiet=True вимикає весь вивід (для вимірювання лише роботи лімітера).
+    clock і sleep дозволяють підставити FakeClock замість реального часу.
     """
-    limiter = SlidingWindowRateLimiter(window_size=10, max_requests=1)
+    if clock is None:
+        clock = time.monotonic_ns
+    limiter = create_sliding_window_limiter(
+        window_size=10, max_requests=1, clock=clock
+    )
+    # Слоти користувачів 1..5 обчислюємо один раз, поза циклами
+    slots = [limiter._slot_of(str(i)) for i in range(1, 6)]
 
-    print(Fore.CYAN + "\n=== Симуляція потоку повідомлень (10 шт) ===")
-    for message_id in range(1, 11):
+    if not quiet:
+        print(Fore.CYAN + "\n=== Симуляція потоку повідомлень (10 шт) ===")
+    # Затримки між повідомленнями (0.1..1.0с) генеруємо одразу для всієї серії
+    delays = [0.1 + 0.9 * random.random() for _ in range(10)]
+    lines = []
+    for message_id, delay in zip(range(1, 11), delays):
         user_id = message_id % 5 + 1
-        can_send = limiter.record_message(str(user_id))
-        wait_time = limiter.time_until_next_allowed(str(user_id))
-
-        print(
-            f"{Fore.GREEN if can_send else Fore.YELLOW}"
-            + f"Повідомлення {message_id:2d} | Користувач {user_id} | "
-            f"{'✓' if can_send else f'× (очікування %.1fс)' % wait_time}"
+        can_send, wait_time = limiter._try_record_slot(
+            slots[user_id - 1], clock()
         )
 
-        time.sleep(random.uniform(0.1, 1.0))
+        if not quiet:
+            lines.append(
+                _OK_LINE.format(message_id, user_id)
+                if can_send
+                else _WAIT_LINE.format(message_id, user_id, _wait_status(wait_time))
+            )
 
-    print(Fore.CYAN + "\nОчікуємо 4 секунди...")
-    time.sleep(4)
+        sleep(delay)
 
-    print(Fore.CYAN + "\n=== Нова серія повідомлень після очікування (ще 10 шт) ===")
-    for message_id in range(11, 21):
-        user_id = message_id % 5 + 1
-        can_send = limiter.record_message(str(user_id))
-        wait_time = limiter.time_until_next_allowed(str(user_id))
+    if not quiet:
+        # Рядки серії виводимо одним записом після циклу
+        sys.stdout.write("".join(lines))
+        print(Fore.CYAN + "\nОчікуємо 4 секунди...")
+    sleep(4)
 
+    if not quiet:
         print(
-            f"{Fore.GREEN if can_send else Fore.YELLOW}"
-            + f"Повідомлення {message_id:2d} | Користувач {user_id} | "
-            f"{'✓' if can_send else f'× (очікування %.1fс)' % wait_time}"
+            Fore.CYAN + "\n=== Нова серія повідомлень після очікування (ще 10 шт) ==="
+        )
+    # Затримки між повідомленнями (0.1..1.0с) генеруємо одразу для всієї серії
+    delays = [0.1 + 0.9 * random.random() for _ in range(10)]
+    lines = []
+    for message_id, delay in zip(range(11, 21), delays):
+        user_id = message_id % 5 + 1
+        can_send, wait_time = limiter._try_record_slot(
+            slots[user_id - 1], clock()
         )
 
-        time.sleep(random.uniform(0.1, 1.0))
+        if not quiet:
+            lines.append(
+                _OK_LINE.format(message_id, user_id)
+                if can_send
+                else _WAIT_LINE.format(message_id, user_id, _wait_status(wait_time))
+            )
+
+        sleep(delay)
+
+    if not quiet:
+        sys.stdout.write("".join(lines))
 
 
 def main():
-    sys.setrecursionlimit(10**7)
+    if "--bench" in sys.argv[1:]:
+        # Бенчмарк без реальних пауз: вимірюємо лише лімітер
+        clock = FakeClock()
+        number = 1000
+        elapsed = timeit.timeit(
+            lambda: demo_scenario(quiet=True, clock=clock, sleep=clock.sleep),
+            number=number,
+        )
+        print(
+            Fore.CYAN
+            + f"\nСередній час сценарію зі штучним годинником = "
+            f"{elapsed / number * 1e6:.1f} мкс"
+        )
+        return
 
     setup_code = "from __main__ import demo_scenario"
     stmt_code = "demo_scenario()"
@@ -132,7 +620,7 @@ def main():
     elapsed = timeit.timeit(stmt=stmt_code, setup=setup_code, number=1)
     print(
         Fore.CYAN
-        + f"\nЧас виконання сценарію (з урахуванням time.sleep та random.uniform) = {elapsed:.2f} сек"
+        + f"\nЧас виконання сценарію (з урахуванням sleep) = {elapsed:.2f} сек"
     )
 
 
@@ -1,111 +1,353 @@
+import array
 import logging
 import random
-from typing import Dict
+from typing import Callable, Dict, List, Optional, Tuple
 import time
 import sys
 import timeit
-from colorama import init, Fore
+from types import SimpleNamespace
+
+try:
+    import numpy as np
+except ImportError:  # numpy потрібен лише для пакетного режиму simulate_batch
+    np = None
+
+try:
+    from numba import njit
+except ImportError:  # без numba ядра виконуються як звичайний Python
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Кольори потрібні лише в терміналі: при перенаправленні stdout (timeit, CI)
+# colorama не імпортуємо, а коди кольорів — порожні рядки.
+USE_COLOR = sys.stdout.isatty()
+if USE_COLOR:
+    from colorama import init, Fore
+
+    init(autoreset=True)
+else:
+    Fore = SimpleNamespace(CYAN="", GREEN="", YELLOW="")
 
-init(autoreset=True)
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - [%(levelname)s] - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Шаблони рядків виводу demo_scenario: колір і статус уже вшиті, тож кожен
+# рядок форматується за один прохід.
+_OK_LINE = Fore.GREEN + "Повідомлення {:2d} | Користувач {} | ✓\n"
+_WAIT_LINE = Fore.YELLOW + "Повідомлення {:2d} | Користувач {} | {}\n"
+# Готові рядки очікування для 0.0..10.0с з кроком 0.1с (ключ — десяті секунди)
+_WAIT_STATUS = {i: f"× (очікування {i / 10:.1f}с)" for i in range(101)}
+
+
+def _wait_status(wait_time: float) -> str:
+    """
+    Рядок статусу відхиленого повідомлення: з таблиці або форматований.
+    Ключ — round(wait_time * 10), тож на точних межах (0.15, 0.35, ...)
+    значення може відрізнятися від %.1f на 0.1с — для виводу це прийнятно.
+    """
+    status = _WAIT_STATUS.get(round(wait_time * 10))
+    if status is None:
+        status = f"× (очікування {wait_time:.1f}с)"
+    return status
+
+
+# Позначка вільного слоту в масиві user_deadline: максимальний int64,
+# тож чистка ніколи не вважає такий слот застарілим
+_FREE_SLOT = 2**63 - 1
+
+
+class FakeClock:
+    """
+    Штучний годинник для бенчмарків: виклик повертає поточний час (нс),
+    а sleep() лише зсуває його, не зупиняючи виконання.
+    """
+
+    def __init__(self, start: int = 0):
+        self.now = start
+
+    def __call__(self) -> int:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += int(seconds * 1e9)
+
 
 class ThrottlingRateLimiter:
     """
     Реалізація Rate Limiter із алгоритмом Throttling:
     - Кожен користувач має min_interval (10с за умовою).
     - Якщо з часу останнього повідомлення не минуло min_interval, не можна відправити.
+    Внутрішньо час зберігається цілими наносекундами.
+    Кожні _GC_INTERVAL викликів record_message/try_record користувачі з
+    дедлайном, що вже минув, видаляються, а їхні слоти перевикористовуються.
     """
 
-    def __init__(self, min_interval: float = 10.0):
+    _GC_INTERVAL = 4096
+
+    def __init__(
+        self,
+        min_interval: float = 10.0,
+        clock: Callable[[], int] = time.monotonic_ns,
+    ):
         self.min_interval = min_interval
-        # user_last_message[user_id] = таймштамп (time.time()) останнього повідомлення
-        self.user_last_message: Dict[str, float] = {}
+        self.min_interval_ns = int(min_interval * 1e9)
+        # Монотонний годинник не стрибає при корекції системного часу (NTP);
+        # для бенчмарків і тестів можна передати FakeClock
+        self._now = clock
+        # _slot[user_id] = індекс у user_deadline (ключі інтерновані через sys.intern)
+        self._slot: Dict[str, int] = {}
+        # user_deadline[slot] = дедлайн (нс), з якого дозволено наступне
+        # повідомлення: час останнього повідомлення + min_interval_ns.
+        # Одне ціле число на користувача — готове до атомарного CAS-оновлення.
+        # Плоский array('q') (SoA) — _sweep сканує його одним проходом.
+        self.user_deadline = array.array("q")
+        # _user_of[slot] = user_id слоту (для видалення з _slot під час чистки)
+        self._user_of: List[Optional[str]] = []
+        # Слоти, звільнені _sweep, і лічильник операцій до наступної чистки
+        self._free: List[int] = []
+        self._ops_since_gc = 0
 
-    def can_send_message(self, user_id: str) -> bool:
+    def _slot_of(self, user_id: str) -> int:
+        """Повертає слот user_id, виділяючи новий при першій появі."""
+        slot = self._slot.get(user_id)
+        if slot is None:
+            user_id = sys.intern(user_id)
+            if self._free:
+                slot = self._free.pop()
+                self.user_deadline[slot] = 0
+                self._user_of[slot] = user_id
+            else:
+                slot = len(self.user_deadline)
+                self.user_deadline.append(0)  # дедлайн 0 — перше повідомлення дозволене
+                self._user_of.append(user_id)
+            self._slot[user_id] = slot
+        return slot
+
+    def _sweep(self, current_time: int) -> None:
+        """
+        Видаляє користувачів, чий дедлайн уже минув (їхній стан не відрізняється
+        від нового користувача), і повертає їхні слоти у _free.
+        """
+        self._ops_since_gc = 0
+        deadlines = self.user_deadline
+        # Один прохід min() на рівні C: якщо застарілих немає — виходимо одразу
+        if not deadlines or min(deadlines) > current_time:
+            return
+        stale = [slot for slot, t in enumerate(deadlines) if t <= current_time]
+        for slot in stale:
+            del self._slot[self._user_of[slot]]
+            self._user_of[slot] = None
+            deadlines[slot] = _FREE_SLOT
+            self._free.append(slot)
+
+    def _try_record_slot(self, slot: int, current_time: int) -> Tuple[bool, float]:
+        """try_record для вже відомого слоту."""
+        deadline = self.user_deadline[slot]
+        if current_time >= deadline:
+            self.user_deadline[slot] = current_time + self.min_interval_ns
+            return True, 0.0
+        return False, (deadline - current_time) / 1e9
+
+    def simulate_batch(
+        self, user_ids: "np.ndarray", timestamps: "np.ndarray"
+    ) -> "np.ndarray":
+        """
+        Пакетна симуляція потоку подій на «чистому» лімітері (власний
+        стан не змінюється). Повертає np.ndarray[bool] — маску прийнятих подій
+        у порядку вхідних масивів. timestamps — у наносекундах, як current_time.
+        Потребує numpy; з numba сканування компілюється.
+        """
+        if np is None:
+            raise ImportError("simulate_batch потребує numpy")
+        user_ids = np.asarray(user_ids)
+        timestamps = np.asarray(timestamps)
+        # Дробові секунди мовчки обрізалися б до 0 нс — вимагаємо цілі наносекунди
+        if not np.issubdtype(timestamps.dtype, np.integer):
+            raise TypeError(
+                "timestamps мають бути цілими наносекундами, а не "
+                f"{timestamps.dtype}"
+            )
+        timestamps = timestamps.astype(np.int64, copy=False)
+        # Цілі коди користувачів і сортування за (користувач, час)
+        _, codes = np.unique(user_ids, return_inverse=True)
+        order = np.lexsort((timestamps, codes))
+        accepted = _throttling_scan(
+            codes[order], timestamps[order], self.min_interval_ns
+        )
+        mask = np.empty(len(order), dtype=np.bool_)
+        mask[order] = accepted
+        return mask
+
+    def can_send_message(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> bool:
         """
         Перевіряє, чи може user_id відправити повідомлення зараз.
         Якщо користувача ще немає або час минув >= min_interval => True
+        current_time — час у наносекундах (None — прочитати годинник).
         """
-        current_time = time.time()
-        if user_id not in self.user_last_message:
+        slot = self._slot.get(user_id)
+        if slot is None:
             return True  # перше повідомлення завжди дозволене
-        last_time = self.user_last_message[user_id]
-        return (current_time - last_time) >= self.min_interval
+        if current_time is None:
+            current_time = self._now()
+        return current_time >= self.user_deadline[slot]
 
-    def record_message(self, user_id: str) -> bool:
+    def record_message(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> bool:
         """
         Реєструє спробу відправити повідомлення.
-        Якщо can_send_message==True, оновлює час і повертає True.
+        Якщо can_send_message==True, оновлює дедлайн і повертає True.
         Інакше повертає False.
+        current_time — час у наносекундах (None — прочитати годинник).
         """
-        if self.can_send_message(user_id):
-            self.user_last_message[user_id] = time.time()
-            return True
-        else:
-            return False
+        if current_time is None:
+            current_time = self._now()
+        self._ops_since_gc += 1
+        if self._ops_since_gc >= self._GC_INTERVAL:
+            self._sweep(current_time)
+        return self._try_record_slot(self._slot_of(user_id), current_time)[0]
 
-    def time_until_next_allowed(self, user_id: str) -> float:
+    def try_record(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> Tuple[bool, float]:
+        """
+        Об'єднує record_message і time_until_next_allowed в один прохід:
+        повертає (True, 0.0), якщо повідомлення зареєстровано,
+        інакше (False, скільки секунд чекати).
+        current_time — час у наносекундах (None — прочитати годинник).
+        """
+        if current_time is None:
+            current_time = self._now()
+        self._ops_since_gc += 1
+        if self._ops_since_gc >= self._GC_INTERVAL:
+            self._sweep(current_time)
+        return self._try_record_slot(self._slot_of(user_id), current_time)
+
+    def time_until_next_allowed(
+        self, user_id: str, current_time: Optional[int] = None
+    ) -> float:
         """
         Повертає час (секунди), через скільки стане можливим відправити повідомлення.
         Якщо можна прямо зараз — 0.0
+        current_time — час у наносекундах (None — прочитати годинник).
         """
-        if user_id not in self.user_last_message:
+        slot = self._slot.get(user_id)
+        if slot is None:
             return 0.0
-        current_time = time.time()
-        last_time = self.user_last_message[user_id]
-        diff = current_time - last_time
-        wait = self.min_interval - diff
-        return max(wait, 0.0)
+        if current_time is None:
+            current_time = self._now()
+        return max(self.user_deadline[slot] - current_time, 0) / 1e9
 
 
-def demo_scenario():
+@njit(cache=True)
+def _throttling_scan(codes, times, min_interval_ns):
+    """
+    Сканування подій, відсортованих за (користувач, час): подія приймається,
+    якщо настав дедлайн користувача, і тоді дедлайн зсувається на min_interval_ns.
+    """
+    n = len(times)
+    accepted = np.zeros(n, dtype=np.bool_)
+    deadline = 0
+    for i in range(n):
+        if i == 0 or codes[i] != codes[i - 1] or times[i] >= deadline:
+            deadline = times[i] + min_interval_ns
+            accepted[i] = True
+    return accepted
+
+
+def demo_scenario(
+    quiet: bool = False,
+    clock: Optional[Callable[[], int]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+):
     """
     Демонстраційна функція:
       - відправляємо 10 повідомлень (user_id=1..5),
       - очікуємо 10 секунд (щоб переконатися, що інтервал справді відкритий),
       - ще 10 повідомлень.
+    quiet=True вимикає весь вивід (для вимірювання лише роботи лімітера).
+    clock і sleep дозволяють підставити FakeClock замість реального часу.
     """
-    limiter = ThrottlingRateLimiter(min_interval=10.0)
+    if clock is None:
+        clock = time.monotonic_ns
+    limiter = ThrottlingRateLimiter(min_interval=10.0, clock=clock)
+    # Слоти користувачів 1..5 обчислюємо один раз, поза циклами
+    slots = [limiter._slot_of(str(i)) for i in range(1, 6)]
 
-    print(Fore.CYAN + "\n=== Симуляція потоку повідомлень (Throttling) ===")
-    for message_id in range(1, 11):
+    if not quiet:
+        print(Fore.CYAN + "\n=== Симуляція потоку повідомлень (Throttling) ===")
+    # Затримки між повідомленнями (0.1..1.0с) генеруємо одразу для всієї серії
+    delays = [0.1 + 0.9 * random.random() for _ in range(10)]
+    lines = []
+    for message_id, delay in zip(range(1, 11), delays):
         user_id = message_id % 5 + 1
-        result = limiter.record_message(str(user_id))
-        wait_time = limiter.time_until_next_allowed(str(user_id))
-
-        print(
-            f"{Fore.GREEN if result else Fore.YELLOW}"
-            + f"Повідомлення {message_id:2d} | Користувач {user_id} | "
-            f"{'✓' if result else f'× (очікування %.1fс)' % wait_time}"
+        result, wait_time = limiter._try_record_slot(
+            slots[user_id - 1], clock()
         )
 
+        if not quiet:
+            lines.append(
+                _OK_LINE.format(message_id, user_id)
+                if result
+                else _WAIT_LINE.format(message_id, user_id, _wait_status(wait_time))
+            )
+
         # Симулюємо випадкову затримку між повідомленнями
-        time.sleep(random.uniform(0.1, 1.0))
+        sleep(delay)
 
-    print(Fore.CYAN + "\nОчікуємо 10 секунд...")
-    time.sleep(10)
+    if not quiet:
+        # Рядки серії виводимо одним записом після циклу
+        sys.stdout.write("".join(lines))
+        print(Fore.CYAN + "\nОчікуємо 10 секунд...")
+    sleep(10)
 
-    print(Fore.CYAN + "\n=== Нова серія повідомлень після очікування ===")
-    for message_id in range(11, 21):
+    if not quiet:
+        print(Fore.CYAN + "\n=== Нова серія повідомлень після очікування ===")
+    # Затримки між повідомленнями (0.1..1.0с) генеруємо одразу для всієї серії
+    delays = [0.1 + 0.9 * random.random() for _ in range(10)]
+    lines = []
+    for message_id, delay in zip(range(11, 21), delays):
         user_id = message_id % 5 + 1
-        result = limiter.record_message(str(user_id))
-        wait_time = limiter.time_until_next_allowed(str(user_id))
-
-        print(
-            f"{Fore.GREEN if result else Fore.YELLOW}"
-            + f"Повідомлення {message_id:2d} | Користувач {user_id} | "
-            f"{'✓' if result else f'× (очікування %.1fс)' % wait_time}"
+        result, wait_time = limiter._try_record_slot(
+            slots[user_id - 1], clock()
         )
 
-        time.sleep(random.uniform(0.1, 1.0))
+        if not quiet:
+            lines.append(
+                _OK_LINE.format(message_id, user_id)
+                if result
+                else _WAIT_LINE.format(message_id, user_id, _wait_status(wait_time))
+            )
+
+        sleep(delay)
+
+    if not quiet:
+        sys.stdout.write("".join(lines))
 
 
 def main():
-    sys.setrecursionlimit(10**7)
+    if "--bench" in sys.argv[1:]:
+        # Бенчмарк без реальних пауз: вимірюємо лише лімітер
+        clock = FakeClock()
+        number = 1000
+        elapsed = timeit.timeit(
+            lambda: demo_scenario(quiet=True, clock=clock, sleep=clock.sleep),
+            number=number,
+        )
+        print(
+            Fore.CYAN
+            + f"\nСередній час сценарію Throttling зі штучним годинником = "
+            f"{elapsed / number * 1e6:.1f} мкс"
+        )
+        return
 
     setup_code = "from __main__ import demo_scenario"
     stmt_code = "demo_scenario()"